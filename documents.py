@@ -0,0 +1,387 @@
+"""Renderowanie wyników analiz do plików DOCX, JSON i Markdown oraz eksport zbiorczy do ZIP.
+
+Moduł nie zależy od Streamlit, dzięki czemu jego funkcje mogą być uruchamiane
+w osobnych procesach roboczych podczas eksportu zbiorczego.
+"""
+import json
+import io
+import os
+import re
+import zipfile
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import docx
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+# Poniżej tej liczby analiz start procesów roboczych kosztuje więcej niż samo renderowanie
+MIN_ENTRIES_FOR_PROCESSES = 20
+
+# Znaki formatowania Markdown, które trzeba poprzedzić ukośnikiem w tekście z modelu
+MARKDOWN_SPECIAL_CHARS = re.compile(r"([\\`*_\[\]<>|])")
+
+def create_webinar_document(analysis):
+    """Tworzy dokument Word z wynikami analizy webinaru."""
+    doc = docx.Document()
+    
+    # Stylizacja tytułu
+    title = doc.add_heading(analysis["title"], 0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    
+    # Opis marketingowy
+    doc.add_heading("Opis", 1)
+    doc.add_paragraph(analysis["description"])
+    
+    # Dla kogo
+    doc.add_heading("Dla kogo", 1)
+    doc.add_paragraph(analysis["target_audience"])
+    
+    # Z tego webinaru dowiesz się...
+    doc.add_heading("Z tego webinaru dowiesz się:", 1)
+    for benefit in analysis["benefits"]:
+        p = doc.add_paragraph()
+        p.add_run("• ").bold = True
+        p.add_run(benefit)
+    
+    # Program (syllabus)
+    doc.add_heading("Program", 1)
+    for i, item in enumerate(analysis["syllabus"], 1):
+        # Tytuł punktu programu
+        p = doc.add_paragraph()
+        p.add_run(f"{i}. {item['title']}").bold = True
+        
+        # Opis punktu programu
+        doc.add_paragraph(item['description']).style = 'List Paragraph'
+    
+    # Cytaty
+    doc.add_heading("Najciekawsze cytaty", 1)
+    for quote in analysis["top_quotes"]:
+        p = doc.add_paragraph()
+        p.add_run(f"❝ {quote} ❞").italic = True
+    
+    # Słowa kluczowe
+    doc.add_heading("Słowa kluczowe", 1)
+    p = doc.add_paragraph()
+    p.add_run(", ".join(analysis["keywords"]))
+    
+    # O prowadzącym
+    doc.add_heading("O prowadzącym", 1)
+    doc.add_paragraph(analysis["instructor_bio"])
+    
+    # Zapisz dokument w formacie BytesIO
+    doc_io = io.BytesIO()
+    doc.save(doc_io)
+    doc_io.seek(0)
+    
+    return doc_io
+
+def create_ebook_document(analysis):
+    """Tworzy dokument Word z wynikami analizy ebooka."""
+    doc = docx.Document()
+    
+    # Stylizacja tytułu
+    title = doc.add_heading(analysis["title"], 0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    
+    # Opis marketingowy
+    doc.add_heading("Opis", 1)
+    doc.add_paragraph(analysis["description"])
+    
+    # Dla kogo
+    doc.add_heading("Dla kogo", 1)
+    doc.add_paragraph(analysis["target_audience"])
+    
+    # Z tego ebooka dowiesz się...
+    doc.add_heading("Z tego ebooka dowiesz się:", 1)
+    for benefit in analysis["benefits"]:
+        p = doc.add_paragraph()
+        p.add_run("• ").bold = True
+        p.add_run(benefit)
+    
+    # Główne tematy
+    doc.add_heading("Główne tematy", 1)
+    for i, item in enumerate(analysis["main_topics"], 1):
+        # Tytuł tematu
+        p = doc.add_paragraph()
+        p.add_run(f"{i}. {item['title']}").bold = True
+        
+        # Opis tematu
+        doc.add_paragraph(item['description']).style = 'List Paragraph'
+    
+    # Odwołania do badań
+    doc.add_heading("Odwołania do badań", 1)
+    for i, reference in enumerate(analysis.get("research_references", []), 1):
+        p = doc.add_paragraph()
+        p.add_run(f"{i}. ").bold = True
+        p.add_run(reference).italic = True
+    
+    # Cytaty
+    doc.add_heading("Najciekawsze cytaty", 1)
+    for quote in analysis["top_quotes"]:
+        p = doc.add_paragraph()
+        p.add_run(f"❝ {quote} ❞").italic = True
+    
+    # Słowa kluczowe
+    doc.add_heading("Słowa kluczowe", 1)
+    p = doc.add_paragraph()
+    p.add_run(", ".join(analysis["keywords"]))
+    
+    # O autorze
+    doc.add_heading("O autorze", 1)
+    doc.add_paragraph(analysis["author_bio"])
+    
+    # Zapisz dokument w formacie BytesIO
+    doc_io = io.BytesIO()
+    doc.save(doc_io)
+    doc_io.seek(0)
+    
+    return doc_io
+
+def escape_markdown_inline(text):
+    """Zamienia tekst na jeden wiersz Markdown z zabezpieczonymi znakami formatowania."""
+    return MARKDOWN_SPECIAL_CHARS.sub(r"\\\1", " ".join(str(text).split()))
+
+def escape_markdown_block(text):
+    """Zabezpiecza tekst wielowierszowy tak, aby żaden wiersz nie tworzył nowego elementu Markdown."""
+    lines = []
+    for line in str(text).splitlines():
+        line = MARKDOWN_SPECIAL_CHARS.sub(r"\\\1", line.strip())
+        # Nagłówki, listy i podkreślenia nagłówków zaczynają się od tych znaków
+        if line[:1] in ("#", "-", "+", "="):
+            line = "\\" + line
+        line = re.sub(r"^(\d+)([.)])", r"\1\\\2", line)
+        lines.append(line)
+    return "\n".join(lines).strip("\n")
+
+def create_markdown_document(analysis, analysis_type):
+    """Tworzy dokument Markdown z wynikami analizy webinaru lub ebooka."""
+    inline = escape_markdown_inline
+    block = escape_markdown_block
+    
+    lines = [f"# {inline(analysis['title'])}", ""]
+    
+    lines += ["## Opis", "", block(analysis["description"]), ""]
+    lines += ["## Dla kogo", "", block(analysis["target_audience"]), ""]
+    
+    if analysis_type == "webinar":
+        lines += ["## Z tego webinaru dowiesz się:", ""]
+    else:
+        lines += ["## Z tego ebooka dowiesz się:", ""]
+    lines += [f"- {inline(benefit)}" for benefit in analysis["benefits"]]
+    lines.append("")
+    
+    if analysis_type == "webinar":
+        lines += ["## Program", ""]
+        items = analysis["syllabus"]
+    else:
+        lines += ["## Główne tematy", ""]
+        items = analysis["main_topics"]
+    for i, item in enumerate(items, 1):
+        lines += [f"### {i}. {inline(item['title'])}", "", block(item["description"]), ""]
+    
+    if analysis_type == "ebook":
+        lines += ["## Odwołania do badań", ""]
+        for i, reference in enumerate(analysis.get("research_references", []), 1):
+            lines.append(f"{i}. *{inline(reference)}*")
+        lines.append("")
+    
+    lines += ["## Najciekawsze cytaty", ""]
+    for quote in analysis["top_quotes"]:
+        # Każdy wiersz cytatu musi mieć własny znacznik, inaczej wypada z bloku
+        for line in block(quote).split("\n"):
+            lines.append(f"> *{line}*" if line else ">")
+        lines.append("")
+    
+    lines += ["## Słowa kluczowe", "", ", ".join(inline(keyword) for keyword in analysis["keywords"]), ""]
+    
+    if analysis_type == "webinar":
+        lines += ["## O prowadzącym", "", block(analysis["instructor_bio"]), ""]
+    else:
+        lines += ["## O autorze", "", block(analysis["author_bio"]), ""]
+    
+    return "\n".join(lines)
+
+def get_export_basename(index, analysis):
+    """Buduje bezpieczną nazwę pliku na podstawie numeru i tytułu analizy.
+    
+    Unikalność zapewnia numer - tytuły różniące się tylko interpunkcją dają ten
+    sam fragment tekstowy, który służy jedynie do rozpoznania pliku.
+    """
+    slug = re.sub(r"[^\w]+", "_", analysis.get("title", "")).strip("_").lower()
+    return f"{index:03d}_{slug[:60] or 'analiza'}"
+
+def render_export_files(index, entry, formats):
+    """Renderuje pliki wybranych formatów dla jednej zapisanej analizy."""
+    analysis = entry["analysis"]
+    analysis_type = entry["type"]
+    basename = get_export_basename(index, analysis)
+    files = []
+    
+    if "DOCX" in formats:
+        if analysis_type == "webinar":
+            doc_io = create_webinar_document(analysis)
+        else:
+            doc_io = create_ebook_document(analysis)
+        files.append((f"docx/{basename}.docx", doc_io.getvalue()))
+    
+    if "JSON" in formats:
+        data = json.dumps(analysis, indent=4, ensure_ascii=False)
+        files.append((f"json/{basename}.json", data.encode("utf-8")))
+    
+    if "Markdown" in formats:
+        data = create_markdown_document(analysis, analysis_type)
+        files.append((f"markdown/{basename}.md", data.encode("utf-8")))
+    
+    return files
+
+def get_export_worker_count(total, max_workers=None):
+    """Zwraca liczbę procesów roboczych: nie więcej niż analiz i rdzeni dostępnych dla procesu."""
+    try:
+        # Uwzględnia ograniczenia affinity/cgroup w kontenerach (niedostępne np. na macOS)
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    if max_workers:
+        cpus = min(cpus, max_workers)
+    return max(1, min(total, cpus))
+
+def render_in_process(entries, formats):
+    """Renderuje analizy po kolei w bieżącym procesie."""
+    for index, entry in enumerate(entries, 1):
+        yield render_export_files(index, entry, formats)
+
+def render_in_processes(entries, formats, workers):
+    """Renderuje analizy w procesach roboczych i zwraca wyniki w kolejności wyboru.
+    
+    Procesy są uruchamiane przez forkserver (lub spawn), a nie przez fork
+    wielowątkowego serwera Streamlit. Naraz zlecanych jest najwyżej
+    2 * workers analiz, więc gotowe wyniki nie gromadzą się w pamięci.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+    else:
+        context = multiprocessing.get_context("spawn")
+    
+    window = workers * 2
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        pending = deque()
+        try:
+            for index, entry in enumerate(entries, 1):
+                pending.append(executor.submit(render_export_files, index, entry, formats))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+def create_bulk_export(entries, formats, output_file, max_workers=None, progress_callback=None):
+    """Renderuje wiele analiz i dopisuje je po kolei do archiwum ZIP w output_file.
+    
+    Każdy wynik jest zapisywany do archiwum zaraz po wyrenderowaniu i od razu
+    zwalniany, więc przy output_file będącym ścieżką na dysku w pamięci nie
+    powstaje całe archiwum. Większe wybory są renderowane równolegle w osobnych
+    procesach (python-docx jest ograniczony przez GIL, więc wątki nie dają
+    przyspieszenia); małe wybory i maszyny z jednym rdzeniem - w bieżącym procesie.
+    
+    Jeśli renderowanie którejś analizy się nie powiedzie, zgłaszany jest
+    RuntimeError z numerem i tytułem tej analizy.
+    """
+    total = len(entries)
+    workers = get_export_worker_count(total, max_workers)
+    if workers > 1 and total >= MIN_ENTRIES_FOR_PROCESSES:
+        results = render_in_processes(entries, formats, workers)
+    else:
+        results = render_in_process(entries, formats)
+    
+    with zipfile.ZipFile(output_file, "w", compression=zipfile.ZIP_DEFLATED) as zip_file:
+        for done, entry in enumerate(entries, 1):
+            try:
+                files = next(results)
+            except Exception as e:
+                results.close()
+                title = entry["analysis"].get("title", "")
+                raise RuntimeError(
+                    f'Nie udało się wyeksportować analizy nr {done} "{title}": {type(e).__name__}: {e}'
+                ) from e
+            
+            # Pliki DOCX są już skompresowane, więc zapisujemy je bez ponownej kompresji
+            for name, data in files:
+                if name.endswith(".docx"):
+                    zip_file.writestr(name, data, compress_type=zipfile.ZIP_STORED)
+                else:
+                    zip_file.writestr(name, data)
+            
+            if progress_callback:
+                progress_callback(done, total)
+    
+    return output_file
+
+if __name__ == "__main__":
+    # Samotest: python documents.py
+    import tempfile
+    
+    webinar = {
+        "title": "Sprzedaż B2B: jak zacząć?",
+        "description": "Opis\n# nie nagłówek",
+        "target_audience": "Handlowcy",
+        "benefits": ["Korzyść *pierwsza*", "Korzyść\ndruga"],
+        "syllabus": [{"title": "Wstęp", "description": "- nie lista"}],
+        "top_quotes": ["Pierwszy wiersz\nDrugi wiersz\n\nTrzeci wiersz"],
+        "keywords": ["sprzedaż", "b2b"],
+        "instructor_bio": "Prowadzący",
+    }
+    ebook = {
+        "title": "Sprzedaż B2B - jak zacząć!",
+        "description": "Opis",
+        "target_audience": "Handlowcy",
+        "benefits": ["Korzyść"],
+        "main_topics": [{"title": "Temat", "description": "1. nie lista"}],
+        "research_references": ["Badanie <2020>"],
+        "top_quotes": ["Cytat"],
+        "keywords": ["ebook"],
+        "author_bio": "Autor",
+    }
+    entries = [{"type": "webinar", "analysis": webinar}, {"type": "ebook", "analysis": ebook}]
+    formats = ["DOCX", "JSON", "Markdown"]
+    
+    markdown = create_markdown_document(webinar, "webinar")
+    assert "> *Pierwszy wiersz*\n> *Drugi wiersz*\n>\n> *Trzeci wiersz*" in markdown
+    assert "\\# nie nagłówek" in markdown and "\\- nie lista" in markdown
+    assert "- Korzyść druga" in markdown and "\\*pierwsza\\*" in markdown
+    assert "1\\. nie lista" in create_markdown_document(ebook, "ebook")
+    assert get_export_basename(1, webinar) != get_export_basename(2, ebook)
+    
+    # research_references nie jest wymagane w schemacie ebooka
+    ebook_without_references = {k: v for k, v in ebook.items() if k != "research_references"}
+    create_ebook_document(ebook_without_references)
+    create_markdown_document(ebook_without_references, "ebook")
+    
+    # Procesy robocze muszą dawać te same pliki co renderowanie w bieżącym procesie
+    assert list(render_in_processes(entries, formats, 2)) == list(render_in_process(entries, formats))
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        zip_path = os.path.join(temp_dir, "analizy.zip")
+        create_bulk_export(entries, formats, zip_path)
+        with zipfile.ZipFile(zip_path) as zip_file:
+            assert zip_file.testzip() is None
+            infos = zip_file.infolist()
+            assert len(infos) == 6
+            for info in infos:
+                expected = zipfile.ZIP_STORED if info.filename.endswith(".docx") else zipfile.ZIP_DEFLATED
+                assert info.compress_type == expected, info.filename
+            for info in infos:
+                if info.filename.endswith(".docx"):
+                    docx.Document(io.BytesIO(zip_file.read(info)))
+        
+        broken = {"type": "webinar", "analysis": dict(webinar, benefits=None)}
+        try:
+            create_bulk_export([entries[0], broken], formats, zip_path)
+        except RuntimeError as e:
+            assert "analizy nr 2" in str(e)
+        else:
+            raise AssertionError("Oczekiwano błędu eksportu")
+    
+    print("OK")
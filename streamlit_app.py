@@ -4,13 +4,12 @@ import json
 import time
 import os
 from openai import OpenAI
-import docx
-from docx.shared import Pt, RGBColor, Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
 import io
 import base64
 import tempfile
+from datetime import datetime
 import PyPDF2
+from documents import create_webinar_document, create_ebook_document, create_bulk_export
 
 # Konfiguracja API keys z secrets lub zmiennych środowiskowych
 def get_api_keys():
@@ -354,123 +353,6 @@ def analyze_ebook(text, openai_api_key):
         st.text(response.choices[0].message.content)
         return None
 
-def create_webinar_document(analysis):
-    """Tworzy dokument Word z wynikami analizy webinaru."""
-    doc = docx.Document()
-    
-    # Stylizacja tytułu
-    title = doc.add_heading(analysis["title"], 0)
-    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    
-    # Opis marketingowy
-    doc.add_heading("Opis", 1)
-    doc.add_paragraph(analysis["description"])
-    
-    # Dla kogo
-    doc.add_heading("Dla kogo", 1)
-    doc.add_paragraph(analysis["target_audience"])
-    
-    # Z tego webinaru dowiesz się...
-    doc.add_heading("Z tego webinaru dowiesz się:", 1)
-    for benefit in analysis["benefits"]:
-        p = doc.add_paragraph()
-        p.add_run("• ").bold = True
-        p.add_run(benefit)
-    
-    # Program (syllabus)
-    doc.add_heading("Program", 1)
-    for i, item in enumerate(analysis["syllabus"], 1):
-        # Tytuł punktu programu
-        p = doc.add_paragraph()
-        p.add_run(f"{i}. {item['title']}").bold = True
-        
-        # Opis punktu programu
-        doc.add_paragraph(item['description']).style = 'List Paragraph'
-    
-    # Cytaty
-    doc.add_heading("Najciekawsze cytaty", 1)
-    for quote in analysis["top_quotes"]:
-        p = doc.add_paragraph()
-        p.add_run(f"❝ {quote} ❞").italic = True
-    
-    # Słowa kluczowe
-    doc.add_heading("Słowa kluczowe", 1)
-    p = doc.add_paragraph()
-    p.add_run(", ".join(analysis["keywords"]))
-    
-    # O prowadzącym
-    doc.add_heading("O prowadzącym", 1)
-    doc.add_paragraph(analysis["instructor_bio"])
-    
-    # Zapisz dokument w formacie BytesIO
-    doc_io = io.BytesIO()
-    doc.save(doc_io)
-    doc_io.seek(0)
-    
-    return doc_io
-
-def create_ebook_document(analysis):
-    """Tworzy dokument Word z wynikami analizy ebooka."""
-    doc = docx.Document()
-    
-    # Stylizacja tytułu
-    title = doc.add_heading(analysis["title"], 0)
-    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    
-    # Opis marketingowy
-    doc.add_heading("Opis", 1)
-    doc.add_paragraph(analysis["description"])
-    
-    # Dla kogo
-    doc.add_heading("Dla kogo", 1)
-    doc.add_paragraph(analysis["target_audience"])
-    
-    # Z tego ebooka dowiesz się...
-    doc.add_heading("Z tego ebooka dowiesz się:", 1)
-    for benefit in analysis["benefits"]:
-        p = doc.add_paragraph()
-        p.add_run("• ").bold = True
-        p.add_run(benefit)
-    
-    # Główne tematy
-    doc.add_heading("Główne tematy", 1)
-    for i, item in enumerate(analysis["main_topics"], 1):
-        # Tytuł tematu
-        p = doc.add_paragraph()
-        p.add_run(f"{i}. {item['title']}").bold = True
-        
-        # Opis tematu
-        doc.add_paragraph(item['description']).style = 'List Paragraph'
-    
-    # Odwołania do badań
-    doc.add_heading("Odwołania do badań", 1)
-    for i, reference in enumerate(analysis["research_references"], 1):
-        p = doc.add_paragraph()
-        p.add_run(f"{i}. ").bold = True
-        p.add_run(reference).italic = True
-    
-    # Cytaty
-    doc.add_heading("Najciekawsze cytaty", 1)
-    for quote in analysis["top_quotes"]:
-        p = doc.add_paragraph()
-        p.add_run(f"❝ {quote} ❞").italic = True
-    
-    # Słowa kluczowe
-    doc.add_heading("Słowa kluczowe", 1)
-    p = doc.add_paragraph()
-    p.add_run(", ".join(analysis["keywords"]))
-    
-    # O autorze
-    doc.add_heading("O autorze", 1)
-    doc.add_paragraph(analysis["author_bio"])
-    
-    # Zapisz dokument w formacie BytesIO
-    doc_io = io.BytesIO()
-    doc.save(doc_io)
-    doc_io.seek(0)
-    
-    return doc_io
-
 def get_download_link(doc_io, filename="analiza.docx"):
     """Generuje link do pobrania dokumentu Word."""
     b64 = base64.b64encode(doc_io.read()).decode()
@@ -544,7 +426,7 @@ def display_ebook_analysis(analysis):
         st.write(item['description'])
     
     st.header("Odwołania do badań")
-    for i, reference in enumerate(analysis["research_references"], 1):
+    for i, reference in enumerate(analysis.get("research_references", []), 1):
         st.markdown(f"**{i}.** *{reference}*")
     
     st.header("Najciekawsze cytaty")
@@ -576,6 +458,49 @@ def display_ebook_analysis(analysis):
         key=f"download_json_{display_id}"
     )
 
+def display_bulk_export():
+    """Wyświetla sekcję zbiorczego eksportu zapisanych analiz do archiwum ZIP."""
+    analyses = st.session_state.analyses
+    
+    st.header("Eksport zbiorczy")
+    
+    labels = [
+        f"{i}. [{entry['type']}] {entry['analysis']['title']} ({entry['created']})"
+        for i, entry in enumerate(analyses, 1)
+    ]
+    selected = st.multiselect("Wybierz analizy do eksportu", labels, default=labels)
+    formats = st.multiselect("Wybierz formaty", ["DOCX", "JSON", "Markdown"], default=["DOCX", "JSON", "Markdown"])
+    
+    if st.button("Przygotuj archiwum ZIP", disabled=not selected or not formats):
+        entries = [analyses[labels.index(label)] for label in selected]
+        progress_bar = st.progress(0)
+        
+        def update_progress(done, total):
+            progress_bar.progress(done / total)
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Archiwum jest zapisywane na dysk po kolei, analiza po analizie
+            zip_path = os.path.join(temp_dir, "analizy.zip")
+            try:
+                create_bulk_export(entries, formats, zip_path, progress_callback=update_progress)
+            except RuntimeError as e:
+                st.error(f"Błąd podczas eksportu zbiorczego: {str(e)}")
+                return
+            
+            st.success(f"Wyeksportowano {len(entries)} analiz.")
+            # Streamlit nie przesyła plików strumieniowo - przy tym wywołaniu wczytuje
+            # gotowe archiwum do swojej pamięci podręcznej; to jedyna jego kopia w RAM.
+            # on_click="ignore" - pobranie nie przeładowuje aplikacji, więc przycisk nie znika
+            with open(zip_path, "rb") as zip_file:
+                st.download_button(
+                    label="Pobierz archiwum ZIP",
+                    data=zip_file,
+                    file_name=f"analizy_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
+                    mime="application/zip",
+                    on_click="ignore",
+                    key=f"download_zip_{st.session_state.display_count}"
+                )
+
 def main():
     st.set_page_config(
         page_title="Analiza Materiałów Edukacyjnych",
@@ -589,6 +514,8 @@ def main():
     # Inicjalizacja session_state
     if "display_count" not in st.session_state:
         st.session_state.display_count = 0
+    if "analyses" not in st.session_state:
+        st.session_state.analyses = []
     
     # Pobieranie kluczy API
     assembly_api_key, openai_api_key = get_api_keys()
@@ -645,6 +572,11 @@ def main():
                         st.session_state.analysis = analysis
                         st.session_state.analysis_type = file_type
                         st.session_state.display_count += 1
+                        st.session_state.analyses.append({
+                            "type": file_type,
+                            "analysis": analysis,
+                            "created": datetime.now().strftime("%Y-%m-%d %H:%M")
+                        })
                         
                         # Wyświetl wyniki analizy
                         if file_type == "webinar":
@@ -658,6 +590,10 @@ def main():
                     display_webinar_analysis(st.session_state.analysis)
                 else:
                     display_ebook_analysis(st.session_state.analysis)
+    
+    # Eksport zbiorczy wszystkich analiz zapisanych w tej sesji
+    if st.session_state.analyses:
+        display_bulk_export()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file